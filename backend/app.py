@@ -8,24 +8,35 @@ Run: uvicorn backend.app:app --reload
 """
 
 import asyncio
-import json
 import logging
+import multiprocessing
+import os
+import queue
+import re
 import shutil
+import sqlite3
+import stat
 import subprocess
+import sys
 import tempfile
-import time
-import random
+import threading
 import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, Any
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 
+import janus
+import orjson
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+from sse_starlette.sse import EventSourceResponse, ServerSentEvent
 
 # ---------------------------------------------------------------------------
 # Paths
@@ -36,7 +47,8 @@ STYLES_DIR = BASE_DIR / "styles"
 SCRIPTS_DIR = BASE_DIR / "scripts"
 ASSETS_DIR = BASE_DIR / "assets"
 DOWNLOADS_DIR = BASE_DIR / "downloads"
-JOBS_FILE = BASE_DIR / "jobs.json"
+JOBS_DB = BASE_DIR / "jobs.db"
+JOBS_FILE = BASE_DIR / "jobs.json"  # legacy, imported into JOBS_DB once
 LANG_MAP_FILE = BASE_DIR / "language_map.json"
 LOG_FILE = BASE_DIR / "backend_errors.log"
 
@@ -60,7 +72,19 @@ import urllib.parse
 # ---------------------------------------------------------------------------
 # FastAPI App
 # ---------------------------------------------------------------------------
-app = FastAPI(title="YouTube Auto Dub", version="2.0.0")
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    """Server start/stop hooks (helpers are defined further down)."""
+    # Size the loop's default executor used by asyncio.to_thread()
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=32))
+    _prepare_temp_dir()
+    try:
+        yield
+    finally:
+        _flush_jobs()
+
+
+app = FastAPI(title="YouTube Auto Dub", version="2.0.0", lifespan=_lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -70,39 +94,188 @@ app.add_middleware(
     expose_headers=["Content-Disposition"],
 )
 
-# ---------------------------------------------------------------------------
-# Global State (Persistent)
-# ---------------------------------------------------------------------------
-
 # ---------------------------------------------------------------------------
 # Global State (Persistent)
 # ---------------------------------------------------------------------------
 jobs: Dict[str, Any] = {}
-executor = ThreadPoolExecutor(max_workers=3)
+# Whole dubbing pipelines are capped at MAX_PIPELINES: each one renders with
+# ffmpeg, holds its PCM track in memory and opens TTS_WORKERS connections.
+# Whisper transcription is CPU/GPU-bound and runs in its own process so it
+# never holds the GIL against other jobs ("spawn" keeps CUDA usable in the
+# child). Direct downloads are pure I/O and share the larger io_pool.
+MAX_PIPELINES = 3
+pipeline_pool = ThreadPoolExecutor(max_workers=MAX_PIPELINES)
+io_pool = ThreadPoolExecutor(max_workers=32)
+
+
+def _new_cpu_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+
+
+cpu_pool = _new_cpu_pool()
+_cpu_pool_lock = threading.Lock()
+TTS_WORKERS = 8  # concurrent TTS requests per pipeline
+# FFmpeg thread budgets so concurrent jobs don't each claim every core:
+# renders split the cores between pipelines, and the TTS_WORKERS
+# fit_audio_pcm passes of a pipeline split that pipeline's share.
+FFMPEG_THREADS = max(1, (os.cpu_count() or 1) // MAX_PIPELINES)
+FIT_THREADS = max(1, FFMPEG_THREADS // TTS_WORKERS)
+EVENT_QUEUE_SIZE = 256  # buffered SSE events per job
+
+# Jobs are persisted per row in SQLite (WAL mode). Mutations are queued and
+# applied by a single writer thread so worker threads never block on disk.
+_JOB_COLUMNS = (
+    "status", "progress", "message", "url", "lang", "gender", "subtitle",
+    "output_file", "output_name", "created", "updated",
+)
+_persist_q: "queue.Queue[Optional[tuple]]" = queue.Queue()
+
+
+def _connect_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(JOBS_DB, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS jobs("
+        "id TEXT PRIMARY KEY, status TEXT, progress INT, message TEXT, "
+        "url TEXT, lang TEXT, gender TEXT, subtitle INT, "
+        "output_file TEXT, output_name TEXT, created TEXT, updated TEXT)"
+    )
+    return conn
 
-def save_jobs():
+
+def _upsert_job(conn: sqlite3.Connection, job_id: str, patch: Dict[str, Any]):
+    cols = [c for c in _JOB_COLUMNS if c in patch and c != "updated"] + ["updated"]
+    values = [patch[c] for c in cols[:-1]] + [datetime.now().isoformat()]
+    conn.execute(
+        f"INSERT INTO jobs(id, {', '.join(cols)}) VALUES (?{', ?' * len(cols)}) "
+        f"ON CONFLICT(id) DO UPDATE SET {', '.join(f'{c}=excluded.{c}' for c in cols)}",
+        [job_id, *values],
+    )
+
+
+def _import_legacy_jobs(conn: sqlite3.Connection):
+    """One-time import of jobs.json from older versions."""
+    if not JOBS_FILE.exists():
+        return
     try:
-        # Filter out non-serializable (transient) objects like queues
-        serializable = {}
-        for jid, data in jobs.items():
-            serializable[jid] = {k: v for k, v in data.items() if k != "queue"}
-        with open(JOBS_FILE, "w", encoding="utf-8") as f:
-            json.dump(serializable, f, indent=2, ensure_ascii=False)
+        legacy: Dict[str, Any] = orjson.loads(JOBS_FILE.read_bytes())
     except Exception as e:
-        log.error("Error saving jobs: %s", e)
+        log.error("Error reading legacy jobs file: %s", e)
+        return
+    if not legacy:
+        return
+    conn.execute("BEGIN")
+    for jid, data in legacy.items():
+        _upsert_job(conn, jid, data)
+    conn.execute("COMMIT")
+    JOBS_FILE.rename(JOBS_FILE.with_name(JOBS_FILE.name + ".migrated"))
+    log.info("Imported %d legacy jobs into %s", len(legacy), JOBS_DB.name)
+
 
 def load_jobs():
+    """Populate the in-memory jobs dict from the database."""
     global jobs
-    if JOBS_FILE.exists():
+    try:
+        conn = _connect_db()
+        if conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 0:
+            _import_legacy_jobs(conn)
+        conn.row_factory = sqlite3.Row
+        jobs = {}
+        for row in conn.execute("SELECT * FROM jobs"):
+            data = dict(row)
+            data["subtitle"] = bool(data["subtitle"]) if data["subtitle"] is not None else None
+            jobs[data["id"]] = data
+        conn.close()
+        log.info("Loaded %d jobs from %s", len(jobs), JOBS_DB.name)
+    except Exception as e:
+        log.error("Error loading jobs: %s", e)
+        jobs = {}
+
+
+def _persist(job_id: str, patch: Dict[str, Any]):
+    """Queue a job mutation for the database writer (never blocks)."""
+    _persist_q.put_nowait((job_id, patch))
+
+
+def _db_writer():
+    """Apply queued job mutations, one transaction per burst of events."""
+    conn = _connect_db()
+    stop = False
+    while not stop:
+        batch = [_persist_q.get()]
+        while True:
+            try:
+                batch.append(_persist_q.get_nowait())
+            except queue.Empty:
+                break
+        # WAL + synchronous=NORMAL doesn't fsync on commit; only pay for a
+        # durable commit when a job reaches a final state.
+        durable = any(
+            item is not None and item[1].get("status") in ("complete", "error")
+            for item in batch
+        )
         try:
-            with open(JOBS_FILE, "r", encoding="utf-8") as f:
-                jobs = json.load(f)
-                log.info("Loaded %d jobs from %s", len(jobs), JOBS_FILE.name)
+            conn.execute(f"PRAGMA synchronous={'FULL' if durable else 'NORMAL'}")
+            conn.execute("BEGIN")
+            for item in batch:
+                if item is None:
+                    stop = True
+                    continue
+                _upsert_job(conn, *item)
+            conn.execute("COMMIT")
         except Exception as e:
-            log.error("Error loading jobs: %s", e)
-            jobs = {}
+            log.error("Error saving jobs: %s", e)
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+    conn.close()
+
 
 load_jobs()
+_db_thread = threading.Thread(target=_db_writer, name="jobs-db", daemon=True)
+_db_thread.start()
+
+
+def _prepare_temp_dir():
+    """Clear TEMP_DIR once per server start.
+
+    Doing this per job would wipe files that concurrent jobs are still using.
+    """
+    try:
+        _cleanup()
+    except Exception:
+        log.warning("Could not prepare temp directory", exc_info=True)
+
+
+def _flush_jobs():
+    """Drain pending job writes before the server exits (e.g. on SIGTERM)."""
+    _persist_q.put(None)
+    _db_thread.join(timeout=5)
+
+
+# ---------------------------------------------------------------------------
+# System capabilities (probed once per process)
+# ---------------------------------------------------------------------------
+FFMPEG = shutil.which("ffmpeg")
+FFPROBE = shutil.which("ffprobe")
+
+TORCH_AVAILABLE = False
+DEVICE = "cpu"
+try:
+    import torch
+    TORCH_AVAILABLE = True
+    if torch.cuda.is_available():
+        DEVICE = "cuda"
+except ImportError:
+    pass
+except Exception:
+    log.warning("CUDA probe failed, falling back to CPU", exc_info=True)
+
+if not (FFMPEG and FFPROBE):
+    log.error("FFmpeg/FFprobe not found on PATH — dubbing jobs will fail until installed.")
+if not TORCH_AVAILABLE:
+    log.error("PyTorch is not installed — dubbing jobs will fail. Run: pip install torch")
+
 
 class DubRequest(BaseModel):
     url: str
@@ -117,13 +290,33 @@ class DubRequest(BaseModel):
 def _load_languages() -> dict:
     """Load and parse the language map JSON."""
     try:
-        with open(LANG_MAP_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(LANG_MAP_FILE, "rb") as f:
+            return orjson.loads(f.read())
     except Exception:
         log.exception("Failed to load language_map.json")
         return {}
 
 
+def _enqueue_event(job: dict, event: dict):
+    """Put an event on the job's bounded queue, dropping the oldest if full.
+
+    Progress events are absolute (not deltas), so losing intermediate ones
+    only makes the progress bar skip ahead.
+    """
+    # janus: thread-safe sync side for the worker, async side for the SSE handler
+    q = job["queue"].sync_q
+    while True:
+        try:
+            q.put_nowait(event)
+            return
+        except janus.SyncQueueFull:
+            try:
+                q.get_nowait()
+                job["dropped_events"] = job.get("dropped_events", 0) + 1
+            except janus.SyncQueueEmpty:
+                pass
+
+
 def _push(job_id: str, step: str, progress: int, message: str, status: str = "processing"):
     """Push a progress event into the job's queue."""
     job = jobs.get(job_id)
@@ -137,61 +330,116 @@ def _push(job_id: str, step: str, progress: int, message: str, status: str = "pr
         "timestamp": datetime.now().isoformat(),
     }
     log.info("[%s] %s — %d%% — %s", job_id[:8], step, progress, message)
-    try:
-        job["queue"].put_nowait(event)
-    except Exception:
-        pass
+    # Nobody is listening: skip intermediate events, but always queue the
+    # final one so a reconnecting client still sees the result.
+    if not job.get("client_disconnected") or status in ("complete", "error"):
+        _enqueue_event(job, event)
     
     # Update job state for persistence
     job["status"] = status
     job["progress"] = progress
     job["message"] = message
-    if progress % 10 == 0 or status in ("complete", "error"):
-        save_jobs()
+    _persist(job_id, {"status": status, "progress": progress, "message": message})
+
+
+def _reencode_aac(job_id: str, src: Path, dst: Path, duration: float, timeout: float = 120):
+    """Copy video and re-encode audio to AAC, streaming progress (96–99%).
+
+    Returns (success, tail of ffmpeg's error output).
+    """
+    proc = subprocess.Popen(
+        [
+            "ffmpeg", "-v", "error", "-nostats", "-progress", "pipe:2",
+            "-i", str(src),
+            "-c:v", "copy",        # keep video stream as-is
+            "-c:a", "aac",          # re-encode audio to AAC
+            "-b:a", "192k",
+            "-threads", str(FFMPEG_THREADS),
+            str(dst),
+            "-y",                   # overwrite if exists
+        ],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE, text=True, errors="replace",
+    )
+    watchdog = threading.Timer(timeout, proc.kill)
+    watchdog.start()
+    errors = deque(maxlen=20)
+    total_us = duration * 1_000_000
+    last_pct = 96
+    try:
+        for line in proc.stderr:
+            key, sep, value = line.strip().partition("=")
+            if not sep or " " in key:
+                errors.append(line)  # not a -progress key=value line
+            # out_time_ms is reported in microseconds as well
+            elif key in ("out_time_us", "out_time_ms") and total_us > 0 and value.isdigit():
+                pct = min(99, 96 + int(3 * int(value) / total_us))
+                if pct > last_pct:
+                    last_pct = pct
+                    _push(job_id, "download", pct, "Converting audio to AAC…")
+        proc.wait()
+    finally:
+        watchdog.cancel()
+    return proc.returncode == 0, "".join(errors)
 
 
 def _check_dependencies():
     """Check for ffmpeg, ffprobe and torch."""
-    missing = []
-    if not shutil.which("ffmpeg"):
-        missing.append("ffmpeg")
-    if not shutil.which("ffprobe"):
-        missing.append("ffprobe")
+    missing = [name for name, path in (("ffmpeg", FFMPEG), ("ffprobe", FFPROBE)) if not path]
     if missing:
         raise RuntimeError(f"Missing system dependencies: {', '.join(missing)}. Install FFmpeg.")
-    try:
-        import torch  # noqa: F401
-    except ImportError:
+    if not TORCH_AVAILABLE:
         raise RuntimeError("PyTorch is not installed. Run: pip install torch")
 
 
+def _force_remove(func, path, _exc):
+    """rmtree error handler: clear the read-only bit and retry once."""
+    os.chmod(path, stat.S_IWRITE)
+    func(path)
+
+
 def _cleanup():
-    """Clean the temp directory with retry for Windows file locks."""
+    """Clean the temp directory, moving it aside if files are still locked."""
     import src.engines as eng
-    for attempt in range(5):
+    if eng.TEMP_DIR.exists():
         try:
-            if eng.TEMP_DIR.exists():
-                shutil.rmtree(eng.TEMP_DIR)
-            eng.TEMP_DIR.mkdir(parents=True, exist_ok=True)
-            return
-        except PermissionError:
-            time.sleep(0.5 * (2 ** attempt))
-    log.warning("Could not fully clean temp directory after retries.")
-
-
-def _create_base_silence() -> Path:
-    """Generate a 5-minute base silence WAV file."""
+            if sys.version_info >= (3, 12):
+                shutil.rmtree(eng.TEMP_DIR, onexc=_force_remove)
+            else:
+                shutil.rmtree(eng.TEMP_DIR, onerror=_force_remove)
+        except OSError:
+            # Open handles on Windows: rename out of the way and let a
+            # background thread delete it once the locks are released.
+            trash = eng.TEMP_DIR.with_name(f".trash-{uuid.uuid4().hex}")
+            try:
+                os.rename(eng.TEMP_DIR, trash)
+                threading.Thread(
+                    target=shutil.rmtree, args=(trash,),
+                    kwargs={"ignore_errors": True}, daemon=True,
+                ).start()
+            except OSError:
+                log.warning("Could not clean temp directory %s", eng.TEMP_DIR)
+    eng.TEMP_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def _transcribe(audio_path: Path, device: str) -> list:
+    """Transcribe in cpu_pool, restarting the worker once if it has died."""
+    global cpu_pool
     import src.engines as eng
-    path = eng.TEMP_DIR / "silence_base.wav"
-    if path.exists():
-        return path
-    cmd = [
-        "ffmpeg", "-y", "-v", "error",
-        "-f", "lavfi", "-i", "anullsrc=r=24000:cl=mono",
-        "-t", "300", "-c:a", "pcm_s16le", str(path),
-    ]
-    subprocess.run(cmd, check=True)
-    return path
+
+    pool = cpu_pool
+    try:
+        return pool.submit(eng.transcribe_in_worker, audio_path, device).result()
+    except BrokenProcessPool:
+        # A crashed worker (OOM, CUDA fault) breaks the executor for good;
+        # replace it so this job and the following ones can still run.
+        with _cpu_pool_lock:
+            if cpu_pool is pool:
+                log.warning("Transcription worker died, restarting it")
+                pool.shutdown(wait=False)
+                cpu_pool = _new_cpu_pool()
+            pool = cpu_pool
+    return pool.submit(eng.transcribe_in_worker, audio_path, device).result()
 
 
 # ---------------------------------------------------------------------------
@@ -207,16 +455,8 @@ def run_pipeline(job_id: str, url: str, lang: str, gender: str, subtitle: bool):
         # ── Step 0: Init ──────────────────────────────────────────────
         _push(job_id, "init", 0, "Checking dependencies…")
         _check_dependencies()
-        _cleanup()
-
-        device = "cuda"
-        try:
-            import torch
-            if not torch.cuda.is_available():
-                device = "cpu"
-        except Exception:
-            device = "cpu"
 
+        device = DEVICE
         _push(job_id, "init", 5, f"Using device: {device.upper()}")
         engine = eng.Engine(device)
 
@@ -229,7 +469,7 @@ def run_pipeline(job_id: str, url: str, lang: str, gender: str, subtitle: bool):
 
         # ── Step 2: Transcribe ────────────────────────────────────────
         _push(job_id, "transcribe", 20, f"Transcribing with Whisper ({eng.ASR_MODEL})…")
-        raw_segments = engine.transcribe_safe(audio_path)
+        raw_segments = _transcribe(audio_path, device)
         _push(job_id, "transcribe", 35, f"Transcribed {len(raw_segments)} segments ✓")
 
         # ── Step 3: Chunk + Translate ─────────────────────────────────
@@ -245,39 +485,48 @@ def run_pipeline(job_id: str, url: str, lang: str, gender: str, subtitle: bool):
         # ── Step 4: TTS Synthesis ─────────────────────────────────────
         _push(job_id, "synthesize", 57, f"Generating {gender} voice in {lang.upper()}…")
         failed_tts = 0
-        for i, chunk in enumerate(chunks):
-            tts_path = eng.TEMP_DIR / f"chunk_{i:04d}.mp3"
-            try:
-                engine.synthesize(
-                    text=chunk["trans_text"],
-                    target_lang=lang,
-                    gender=gender,
-                    out_path=tts_path,
-                )
-                time.sleep(random.uniform(0.5, 1.5))
-                slot_duration = chunk["end"] - chunk["start"]
-                final_audio = media.fit_audio(tts_path, slot_duration)
-                chunk["processed_audio"] = final_audio
-            except Exception as e:
-                log.warning("TTS failed for chunk %d: %s", i, e)
-                failed_tts += 1
-                continue
-
-            pct = 57 + int((i + 1) / len(chunks) * 23)
-            if i % 3 == 0:
-                _push(job_id, "synthesize", pct, f"Synthesized {i+1}/{len(chunks)} chunks…")
+        done = 0
+
+        def _synthesize_one(chunk: dict) -> bytes:
+            # TTS bytes → fitted PCM without touching TEMP_DIR
+            audio = engine.synthesize(
+                text=chunk["trans_text"],
+                target_lang=lang,
+                gender=gender,
+            )
+            slot_duration = chunk["end"] - chunk["start"]
+            return media.fit_audio_pcm(audio, slot_duration, threads=FIT_THREADS)
+
+        # TTS calls are network-bound; the pool size doubles as the
+        # concurrency cap towards Edge TTS.
+        with ThreadPoolExecutor(max_workers=TTS_WORKERS) as tts_pool:
+            futures = {
+                tts_pool.submit(_synthesize_one, chunk): i
+                for i, chunk in enumerate(chunks)
+            }
+            for fut in as_completed(futures):
+                i = futures[fut]
+                done += 1
+                try:
+                    chunks[i]["processed_audio"] = fut.result()
+                except Exception as e:
+                    log.warning("TTS failed for chunk %d: %s", i, e)
+                    failed_tts += 1
+                    continue
+
+                pct = 57 + int(done / len(chunks) * 23)
+                if done % 3 == 0:
+                    _push(job_id, "synthesize", pct, f"Synthesized {done}/{len(chunks)} chunks…")
 
         _push(job_id, "synthesize", 80, f"Synthesis done ({failed_tts} failures) ✓")
 
         # ── Step 5: Render ────────────────────────────────────────────
         _push(job_id, "render", 82, "Preparing final render…")
-        silence_path = _create_base_silence()
-        concat_list = eng.TEMP_DIR / "concat_list.txt"
-        media.create_concat_file(chunks, silence_path, concat_list)
+        dub_track = media.mix_audio_track(chunks)
 
         subtitle_path = None
         if subtitle:
-            subtitle_path = eng.TEMP_DIR / "subtitles.srt"
+            subtitle_path = eng.TEMP_DIR / f"subtitles_{job_id}.srt"
             media.generate_srt(chunks, subtitle_path)
 
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -287,13 +536,21 @@ def run_pipeline(job_id: str, url: str, lang: str, gender: str, subtitle: bool):
         final_output = DOWNLOADS_DIR / out_name
 
         _push(job_id, "render", 85, "Rendering video (this may take a while)…")
-        media.render_video(video_path, concat_list, final_output, subtitle_path=subtitle_path)
+        try:
+            media.render_video(
+                video_path, dub_track, final_output,
+                subtitle_path=subtitle_path, threads=FFMPEG_THREADS,
+            )
+        finally:
+            if subtitle_path:
+                subtitle_path.unlink(missing_ok=True)
 
         if final_output.exists():
             size_mb = final_output.stat().st_size / (1024 * 1024)
             jobs[job_id]["output_file"] = str(final_output)
             jobs[job_id]["output_name"] = out_name
             jobs[job_id]["status"] = "complete"
+            _persist(job_id, {"output_file": str(final_output), "output_name": out_name})
             _push(job_id, "complete", 100, f"Done! File: {out_name} ({size_mb:.1f} MB)", status="complete")
         else:
             jobs[job_id]["status"] = "error"
@@ -308,27 +565,42 @@ def run_pipeline(job_id: str, url: str, lang: str, gender: str, subtitle: bool):
 # ---------------------------------------------------------------------------
 # Routes
 # ---------------------------------------------------------------------------
+# Built /api/languages payload, keyed on language_map.json's mtime.
+_lang_cache: Dict[str, Any] = {"mtime": 0, "payload": None}
+
+
 @app.get("/api/languages")
-async def get_languages():
+async def get_languages(request: Request):
     """Return available languages with voice info."""
-    data = _load_languages()
-    langs = []
-    for code, info in sorted(data.items(), key=lambda x: x[0]):
-        langs.append({
-            "code": code,
-            "name": info.get("name", code),
-            "has_male": bool(info.get("voices", {}).get("male")),
-            "has_female": bool(info.get("voices", {}).get("female")),
-        })
-    return {"languages": langs}
+    try:
+        mtime = LANG_MAP_FILE.stat().st_mtime_ns
+    except OSError:
+        mtime = 0
+    etag = f'"{mtime}"'
+
+    if mtime != _lang_cache["mtime"] or _lang_cache["payload"] is None:
+        data = _load_languages()
+        langs = []
+        for code, info in sorted(data.items(), key=lambda x: x[0]):
+            langs.append({
+                "code": code,
+                "name": info.get("name", code),
+                "has_male": bool(info.get("voices", {}).get("male")),
+                "has_female": bool(info.get("voices", {}).get("female")),
+            })
+        _lang_cache["payload"] = {"languages": langs}
+        _lang_cache["mtime"] = mtime
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(_lang_cache["payload"], headers={"ETag": etag})
 
 
 @app.post("/api/dub")
 async def start_dub(req: DubRequest):
     """Start a new dubbing job and return the job ID."""
     job_id = str(uuid.uuid4())
-    loop = asyncio.get_event_loop()
-    queue = asyncio.Queue()
+    queue = janus.Queue(maxsize=EVENT_QUEUE_SIZE)
 
     jobs[job_id] = {
         "id": job_id,
@@ -342,14 +614,12 @@ async def start_dub(req: DubRequest):
         "output_file": None,
         "output_name": None,
     }
-    save_jobs()
+    _persist(job_id, {k: v for k, v in jobs[job_id].items() if k in _JOB_COLUMNS})
 
     log.info("Starting job %s for %s → %s", job_id[:8], req.url, req.lang)
-    loop.run_in_executor(
-        executor,
-        run_pipeline,
-        job_id, req.url, req.lang, req.gender, req.subtitle,
-    )
+    # Fire-and-forget: submit straight to the pool instead of wrapping the
+    # future for an event loop nobody awaits it on.
+    pipeline_pool.submit(run_pipeline, job_id, req.url, req.lang, req.gender, req.subtitle)
 
     return {"job_id": job_id}
 
@@ -360,27 +630,25 @@ async def progress_stream(job_id: str):
     if job_id not in jobs:
         raise HTTPException(404, "Job not found")
 
+    job = jobs[job_id]
+    job["client_disconnected"] = False
+
     async def event_generator():
-        job = jobs[job_id]
-        queue: asyncio.Queue = job["queue"]
-        while True:
-            try:
-                event = await asyncio.wait_for(queue.get(), timeout=30.0)
-                yield f"data: {json.dumps(event)}\n\n"
+        queue: janus.Queue = job["queue"]
+        try:
+            while True:
+                event = await queue.async_q.get()
+                yield ServerSentEvent(data=orjson.dumps(event).decode())
                 if event.get("status") in ("complete", "error"):
-                    break
-            except asyncio.TimeoutError:
-                yield f"data: {json.dumps({'step': 'heartbeat', 'progress': -1, 'message': 'waiting…', 'status': 'processing'})}\n\n"
-
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
-    )
+                    return
+        finally:
+            # Also reached when sse-starlette cancels us on disconnect
+            if job.get("status") not in ("complete", "error"):
+                job["client_disconnected"] = True
+
+    # EventSourceResponse sends keepalive ping comments and sets the
+    # no-cache / X-Accel-Buffering headers itself.
+    return EventSourceResponse(event_generator(), ping=15)
 
 
 @app.get("/api/download/{job_id}")
@@ -404,20 +672,51 @@ async def download_result(job_id: str):
         raise HTTPException(404, "Output file not found on disk")
     
     fname = job.get("output_name", path.name)
-    log.info("Serving file: %s (size: %d bytes, path: %s)", fname, path.stat().st_size, path)
+    st = path.stat()
+    log.info("Serving file: %s (size: %d bytes, path: %s)", fname, st.st_size, path)
     
     # Do NOT set filename= here. That would add Content-Disposition: attachment,
     # which triggers IDM interception and steals the response body from fetch().
     # The frontend constructs its own filename via the blob download approach.
+    # Passing stat_result skips FileResponse's own stat() and sets
+    # Content-Length up front so the browser can show download progress.
     return FileResponse(
         path,
-        media_type="application/octet-stream"
+        media_type="application/octet-stream",
+        stat_result=st,
     )
 
 
 # ---------------------------------------------------------------------------
 # Download-Only Feature
 # ---------------------------------------------------------------------------
+# yt-dlp vcodec prefixes (the part before the first ".") → short codec name
+_CODEC_PREFIXES = {
+    "avc1": "h264", "avc3": "h264", "h264": "h264",
+    "vp9": "vp9", "vp09": "vp9",
+    "av01": "av1", "av1": "av1",
+    "hev1": "h265", "hvc1": "h265", "hevc": "h265", "h265": "h265",
+}
+# Fallback for unusual codec strings, tried in this order
+_CODEC_PATTERNS = (
+    ("h264", re.compile(r"avc|h264", re.I)),
+    ("vp9", re.compile(r"vp0?9", re.I)),
+    ("av1", re.compile(r"av0?1", re.I)),
+    ("h265", re.compile(r"hevc|h265", re.I)),
+)
+
+
+def _short_codec(vcodec: str) -> str:
+    """Map a yt-dlp vcodec string to h264/vp9/av1/h265, or "" if unknown."""
+    name = _CODEC_PREFIXES.get(vcodec.split(".", 1)[0].lower())
+    if name:
+        return name
+    for name, pattern in _CODEC_PATTERNS:
+        if pattern.search(vcodec):
+            return name
+    return ""
+
+
 class VideoInfoRequest(BaseModel):
     url: str
 
@@ -441,7 +740,8 @@ async def get_video_info(req: VideoInfoRequest):
 
     try:
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(req.url, download=False)
+            # extract_info does blocking HTTP; keep it off the event loop
+            info = await asyncio.to_thread(ydl.extract_info, req.url, download=False)
     except Exception as e:
         raise HTTPException(400, f"Could not fetch video info: {e}")
 
@@ -482,15 +782,7 @@ async def get_video_info(req: VideoInfoRequest):
                 label = f"video"
 
             # Add codec info for differentiation
-            short_codec = ""
-            if "avc" in vcodec.lower() or "h264" in vcodec.lower():
-                short_codec = "h264"
-            elif "vp9" in vcodec.lower() or "vp09" in vcodec.lower():
-                short_codec = "vp9"
-            elif "av01" in vcodec.lower() or "av1" in vcodec.lower():
-                short_codec = "av1"
-            elif "hevc" in vcodec.lower() or "h265" in vcodec.lower():
-                short_codec = "h265"
+            short_codec = _short_codec(vcodec)
             
             if short_codec:
                 display_label = f"{label} {short_codec}"
@@ -566,8 +858,7 @@ async def download_start(req: DirectDownloadRequest):
     import yt_dlp
 
     job_id = str(uuid.uuid4())
-    loop = asyncio.get_event_loop()
-    queue = asyncio.Queue()
+    queue = janus.Queue(maxsize=EVENT_QUEUE_SIZE)
 
     jobs[job_id] = {
         "id": job_id,
@@ -577,7 +868,7 @@ async def download_start(req: DirectDownloadRequest):
         "output_name": None,
         "created": datetime.now().isoformat(),
     }
-    save_jobs()
+    _persist(job_id, {k: v for k, v in jobs[job_id].items() if k in _JOB_COLUMNS})
 
     def _do_download():
         try:
@@ -648,9 +939,12 @@ async def download_start(req: DirectDownloadRequest):
                         filename = str(mp3_path)
                     elif not Path(filename).exists():
                         # Check if any file with the same stem exists (in case extension is weird)
-                        stem_matches = list(Path(filename).parent.glob(f"{Path(filename).stem}.*"))
-                        if stem_matches:
-                            filename = str(stem_matches[0])
+                        prefix = Path(filename).stem + "."
+                        with os.scandir(Path(filename).parent) as entries:
+                            for entry in entries:
+                                if entry.name.startswith(prefix):
+                                    filename = entry.path
+                                    break
 
             filepath = Path(filename)
             if not filepath.exists() and req.media_type != "audio":
@@ -660,36 +954,24 @@ async def download_start(req: DirectDownloadRequest):
             if filepath.exists() and req.media_type != "audio":
                 _push(job_id, "download", 96, "Converting audio to AAC…")
                 aac_path = filepath.parent / f"{filepath.stem}_aac.mp4"
-                result = subprocess.run(
-                    [
-                        "ffmpeg", "-i", str(filepath),
-                        "-c:v", "copy",        # keep video stream as-is
-                        "-c:a", "aac",          # re-encode audio to AAC
-                        "-b:a", "192k",
-                        str(aac_path),
-                        "-y",                   # overwrite if exists
-                    ],
-                    capture_output=True, timeout=120,
-                )
-                if result.returncode == 0 and aac_path.exists():
+                ok, stderr_tail = _reencode_aac(job_id, filepath, aac_path, info.get("duration") or 0)
+                if ok and aac_path.exists():
                     filepath.unlink(missing_ok=True)  # remove opus version
                     filepath = aac_path
                     log.info("Audio converted to AAC: %s", aac_path.name)
                 else:
-                    log.warning("AAC conversion failed, keeping original: %s",
-                                result.stderr.decode(errors="replace")[-200:])
+                    log.warning("AAC conversion failed, keeping original: %s", stderr_tail[-200:])
 
             if filepath.exists():
                 size_mb = filepath.stat().st_size / (1024 * 1024)
                 jobs[job_id]["output_file"] = str(filepath)
                 jobs[job_id]["output_name"] = filepath.name
                 jobs[job_id]["status"] = "complete"
-                save_jobs()
+                _persist(job_id, {"output_file": str(filepath), "output_name": filepath.name})
                 log.info("Download complete: %s (%.1f MB)", filepath, size_mb)
                 _push(job_id, "complete", 100, f"Done! ({size_mb:.1f} MB)", status="complete")
             else:
                 jobs[job_id]["status"] = "error"
-                save_jobs()
                 log.error("File not found after download: %s", filepath)
                 _push(job_id, "error", 100, "Download finished but file not found.", status="error")
 
@@ -699,7 +981,7 @@ async def download_start(req: DirectDownloadRequest):
             jobs[job_id]["status"] = "error"
 
     log.info("Starting direct download %s — format %s", job_id[:8], req.format_id)
-    loop.run_in_executor(executor, _do_download)
+    io_pool.submit(_do_download)
 
     return {"job_id": job_id}
 # ---------------------------------------------------------------------------
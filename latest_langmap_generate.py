@@ -8,91 +8,190 @@ Multi-Speaker Diarization system.
 It groups voices into 'male' and 'female' lists (pools) for every language,
 enabling the engine to rotate voices for different speakers automatically.
 
-Usage: python latest_langmap_generate.py
+Usage: python latest_langmap_generate.py [--refresh]
+
+The raw voice list is cached per day under .cache/, so reruns on the same
+day work offline. Pass --refresh to fetch it again.
 """
 
+import argparse
 import asyncio
-import json
+import os
+import sys
 import edge_tts
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
 from typing import Dict, List, Any
 
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+    import json
+
+
+def _dumps(obj: Any, indent: bool = True, newline: bool = False) -> bytes:
+    """Serialize to (optionally indented) UTF-8 JSON bytes."""
+    if orjson is not None:
+        option = (orjson.OPT_INDENT_2 if indent else 0) | (orjson.OPT_APPEND_NEWLINE if newline else 0)
+        return orjson.dumps(obj, option=option or None)
+    text = json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+    return (text + "\n" if newline else text).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 # Define path relative to project root (assuming this script is in root or src)
 # Adjust BASE_DIR if you move this script.
 BASE_DIR = Path(__file__).resolve().parent
 LANG_MAP_FILE = BASE_DIR / "language_map.json"
+CACHE_DIR = BASE_DIR / ".cache"
+
+# Below this many voices, process-pool startup costs more than it saves
+PARALLEL_THRESHOLD = 1000
+
+# Shared string objects for the keys repeated across every voice entry
+_MALE = sys.intern("male")
+_FEMALE = sys.intern("female")
+
+
+def _lang_code(locale: str) -> str:
+    """ISO language code of a locale ('vi' from 'vi-VN'), interned."""
+    # Slice instead of split('-') to skip the throwaway list
+    idx = locale.find('-')
+    return sys.intern(locale if idx < 0 else locale[:idx])
 
-async def generate_lang_map() -> None:
+
+def _gender(raw: str) -> str:
+    """Normalize an Edge TTS gender ("Male"/"Female"/...) to an interned key."""
+    return _MALE if raw == "Male" else _FEMALE if raw == "Female" else sys.intern(raw.lower())
+
+
+async def fetch_voices(refresh: bool = False) -> List[Dict[str, Any]]:
+    """Return the Edge TTS voice list, using today's disk cache if present."""
+    cache_file = CACHE_DIR / f"voices_cache_{date.today().strftime('%Y%m%d')}.json"
+    if not refresh and cache_file.exists():
+        try:
+            voices = _loads(cache_file.read_bytes())
+            print(f"[*] Using cached voice list: {cache_file.name}")
+            return voices
+        except Exception as e:
+            print(f"[!] WARNING: Ignoring unreadable voice cache: {e}")
+    
     print("[*] Connecting to Microsoft Edge TTS API...")
+    voices = await edge_tts.list_voices()
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_file.write_bytes(_dumps(voices, indent=False))
+        # Only today's list is ever read back; drop earlier days
+        for stale in CACHE_DIR.glob("voices_cache_*.json"):
+            if stale != cache_file:
+                stale.unlink(missing_ok=True)
+    except OSError as e:
+        print(f"[!] WARNING: Could not cache voice list: {e}")
+    return voices
+
+
+def _build_lang_map(voices: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Group raw Edge TTS voices into per-language male/female pools."""
+    # 1. FILTER + 2. EXTRACT: Neural voices only, as flat rows of
+    # (lang_code, gender, short_name, locale), e.g.
+    # ("vi", "male", "vi-VN-NamMinhNeural", "vi-VN")
+    rows = [
+        (_lang_code(v["Locale"]), _gender(v["Gender"]), sn, v["Locale"])
+        for v in voices
+        if (sn := v["ShortName"]).endswith("Neural")
+    ]
     
+    # 3. GROUP: Stable sorts keep the API's voice order inside each
+    # language and pool (pool[0] is the default voice in engines.py)
+    rows.sort(key=itemgetter(0))
+    
+    # Structure: { "vi": { "name": "vi-VN", "voices": { "male": [], "female": [] } } }
+    lang_map: Dict[str, Any] = {}
+    for lang_code, lang_rows in groupby(rows, key=itemgetter(0)):
+        lang_rows = list(lang_rows)
+        pools: Dict[str, List[str]] = {_MALE: [], _FEMALE: []}
+        
+        # 4. POPULATE: One pool per gender, deduplicated in order
+        # This creates the "List" structure required by engines.py
+        for gender, gender_rows in groupby(sorted(lang_rows, key=itemgetter(1)), key=itemgetter(1)):
+            pools[gender] = list(dict.fromkeys(sn for _, _, sn, _ in gender_rows))
+        
+        lang_map[lang_code] = {
+            "name": lang_rows[0][3],  # first locale seen, as a friendly name reference
+            "voices": pools,
+        }
+    return lang_map
+
+
+def _merge_lang_maps(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge maps built from consecutive slices of the voice list, in order."""
+    merged: Dict[str, Any] = {}
+    for part in parts:
+        for lang_code, info in part.items():
+            target = merged.setdefault(lang_code, {"name": info["name"], "voices": {_MALE: [], _FEMALE: []}})
+            for gender, pool in info["voices"].items():
+                target["voices"].setdefault(gender, []).extend(pool)
+    for info in merged.values():
+        for gender, pool in info["voices"].items():
+            info["voices"][gender] = list(dict.fromkeys(pool))
+    return dict(sorted(merged.items()))
+
+
+async def generate_lang_map(refresh: bool = False) -> None:
     try:
         # Fetch all available voices
-        voices = await edge_tts.list_voices()
+        voices = await fetch_voices(refresh=refresh)
     except Exception as e:
         print(f"[!] CRITICAL: Failed to fetch voices: {e}")
         return
 
     print(f"[*] Processing {len(voices)} raw voice entries...")
     
-    # Structure: { "vi": { "name": "vi-VN", "voices": { "male": [], "female": [] } } }
-    lang_map: Dict[str, Any] = {}
-    
-    for v in voices:
-        # 1. FILTER: Strict quality control - Neural voices only
-        if "Neural" not in v["ShortName"]:
-            continue
-            
-        # 2. EXTRACT: Parse metadata
-        short_name = v["ShortName"]     # e.g., "vi-VN-NamMinhNeural"
-        locale = v["Locale"]            # e.g., "vi-VN"
-        gender = v["Gender"].lower()    # "male" or "female"
-        
-        # ISO Language Code (e.g., 'vi' from 'vi-VN')
-        lang_code = locale.split('-')[0]
-        
-        # 3. INITIALIZE: Create structure if language not seen before
-        if lang_code not in lang_map:
-            lang_map[lang_code] = {
-                "name": locale,  # Store locale as a friendly name reference
-                "voices": {
-                    "male": [],
-                    "female": []
-                }
-            }
-        
-        # 4. POPULATE: Add voice to the specific gender pool
-        # This creates the "List" structure required by engines.py
-        target_list = lang_map[lang_code]["voices"].get(gender)
-        
-        # Handle case where gender might be undefined or new
-        if target_list is None:
-            lang_map[lang_code]["voices"][gender] = []
-            target_list = lang_map[lang_code]["voices"][gender]
-            
-        if short_name not in target_list:
-            target_list.append(short_name)
+    if len(voices) < PARALLEL_THRESHOLD:
+        lang_map = _build_lang_map(voices)
+    else:
+        # Contiguous slices (not strided) so merging keeps the API's voice order
+        workers = os.cpu_count() or 1
+        size = -(-len(voices) // workers)
+        slices = [voices[i:i + size] for i in range(0, len(voices), size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            lang_map = _merge_lang_maps(list(pool.map(_build_lang_map, slices)))
 
     # 5. OPTIMIZE: Remove languages with empty voice lists (optional cleanup)
-    final_map = {
-        k: v for k, v in lang_map.items() 
-        if v["voices"]["male"] or v["voices"]["female"]
-    }
+    # In place, so the map isn't copied just to drop a few entries
+    for k in [k for k, v in lang_map.items() if not (v["voices"][_MALE] or v["voices"][_FEMALE])]:
+        del lang_map[k]
 
     # 6. SAVE: Write to JSON
     try:
-        with open(LANG_MAP_FILE, "w", encoding="utf-8") as f:
-            json.dump(final_map, f, ensure_ascii=False, indent=2)
+        with open(LANG_MAP_FILE, "wb") as f:
+            f.write(_dumps(lang_map, newline=True))
             
-        print(f"\n[+] SUCCESS! Generated configuration for {len(final_map)} languages.")
+        print(f"\n[+] SUCCESS! Generated configuration for {len(lang_map)} languages.")
         print(f"    File saved to: {LANG_MAP_FILE}")
         
         # Preview a specific language (e.g., Vietnamese)
-        if "vi" in final_map:
+        if "vi" in lang_map:
             print("\n[*] Preview (Vietnamese):")
-            print(json.dumps(final_map["vi"], indent=2))
+            print(_dumps(lang_map["vi"]).decode("utf-8"))
             
     except Exception as e:
         print(f"[!] ERROR: Failed to write JSON file: {e}")
 
 if __name__ == "__main__":
-    asyncio.run(generate_lang_map())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate language_map.json from Edge TTS voices")
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore today's cached voice list and fetch it from the API again"
+    )
+    args = parser.parse_args()
+    asyncio.run(generate_lang_map(refresh=args.refresh))
\ No newline at end of file
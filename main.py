@@ -24,7 +24,7 @@ import subprocess
 import time
 import random
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 # Local imports
 import src.engines
@@ -67,6 +67,10 @@ def check_dependencies() -> None:
         print("    Install with: pip install torch")
         exit(1)
 
+# Dependencies don't change within a process; check them once even when
+# main() is called repeatedly (e.g. batch-dubbing a list of URLs).
+_deps_checked = False
+
 def cleanup() -> None:
     """Clean up temporary directory with retry mechanism for Windows file locks.
     
@@ -125,7 +129,7 @@ def create_base_silence() -> Path:
     subprocess.run(cmd, check=True)
     return path
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     """Main entry point for the YouTube Auto Dub pipeline.
     
     Orchestrates the complete dubbing process:
@@ -138,9 +142,15 @@ def main() -> None:
     7. Audio duration fitting and synchronization
     8. Final video rendering with dubbed audio
     
+    Args:
+        argv: Command-line arguments (without the program name). Defaults to
+              sys.argv, so scripts can call main([url, "--lang", "es"]) per URL.
+    
     Raises:
         SystemExit: On critical errors or user interruption.
     """
+    global _deps_checked
+    
     # Parse command line arguments
     parser = argparse.ArgumentParser(
         description="YouTube Auto Dub - Automated Video Dubbing",
@@ -193,14 +203,16 @@ Examples:
         help="Add subtitles into the video. WARNING: Creates slower render time."
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # STEP 0: Environment Setup & Dependency Check
     print("\n" + "="*60)
     print("YOUTUBE AUTO DUB - INITIALIZING")
     print("="*60)
     
-    check_dependencies()
+    if not _deps_checked:
+        check_dependencies()
+        _deps_checked = True
     cleanup()
     
     # Configure processing device
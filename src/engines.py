@@ -268,10 +268,15 @@ class Engine(PipelineComponent):
                 
         return results
 
-    def synthesize(self, text: str, target_lang: str, gender: str, out_path: Path) -> None:
-        """Synthesize speech. Handles both List and String voice configs."""
+    def synthesize(self, text: str, target_lang: str, gender: str, out_path: Optional[Path] = None) -> Optional[bytes]:
+        """Synthesize speech. Handles both List and String voice configs.
+        
+        Writes to out_path when given; otherwise returns the MP3 bytes so
+        callers can keep the audio in memory.
+        """
         if not text.strip(): raise ValueError("Text empty")
-        out_path.parent.mkdir(parents=True, exist_ok=True)
+        if out_path is not None:
+            out_path.parent.mkdir(parents=True, exist_ok=True)
         
         try:
             lang_cfg = self._get_lang_config(target_lang)
@@ -280,13 +285,21 @@ class Engine(PipelineComponent):
             raw_voice = voices.get(gender)
             voice = self._extract_voice_string(raw_voice)
             
-            asyncio.run(edge_tts.Communicate(text, voice=voice).save(str(out_path)))
+            communicate = edge_tts.Communicate(text, voice=voice)
+            if out_path is not None:
+                asyncio.run(communicate.save(str(out_path)))
+                if not validate_audio_file(out_path):
+                    raise AudioProcessingError("TTS file invalid")
+                return None
             
-            if not validate_audio_file(out_path):
-                raise AudioProcessingError("TTS file invalid")
+            audio = asyncio.run(_collect_audio(communicate))
+            if len(audio) < 1024:
+                raise AudioProcessingError("TTS audio invalid")
+            return audio
                 
         except Exception as e:
-            safe_file_delete(out_path)
+            if out_path is not None:
+                safe_file_delete(out_path)
             handle_error(e, "TTS synthesis")
             raise TTSError(f"TTS failed: {e}") from e
 
@@ -349,6 +362,32 @@ class Engine(PipelineComponent):
             self.release_memory('separator')
 
 
+async def _collect_audio(communicate: "edge_tts.Communicate") -> bytes:
+    """Gather the audio chunks of an Edge TTS stream into one buffer."""
+    audio = bytearray()
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            audio.extend(chunk["data"])
+    return bytes(audio)
+
+
+# Engine reused across calls inside a process-pool worker
+_worker_engine: Optional[Engine] = None
+
+
+def transcribe_in_worker(audio_path: Path, device: str) -> List[Dict]:
+    """Process-pool entry point for Whisper transcription.
+    
+    Reuses one Engine per worker process. The Whisper model itself is not
+    cached: transcribe_safe releases it after every call, so each job
+    reloads it. Must stay a module-level function so it can be pickled by the pool.
+    """
+    global _worker_engine
+    if _worker_engine is None or _worker_engine.device != device:
+        _worker_engine = Engine(device)
+    return _worker_engine.transcribe_safe(audio_path)
+
+
 # =============================================================================
 # PIPELINE ORCHESTRATION
 # =============================================================================
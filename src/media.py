@@ -25,6 +25,12 @@ from typing import List, Dict, Optional, Union
 # Import configuration for audio parameters
 from src.engines import SAMPLE_RATE, AUDIO_CHANNELS
 
+
+def _thread_args(threads: Optional[int]) -> List[str]:
+    """FFmpeg -threads option, or nothing to keep FFmpeg's own default."""
+    return ['-threads', str(threads)] if threads else []
+
+
 def get_duration(path: Path) -> float:
     """Get the duration of an audio/video file using FFprobe.
     
@@ -90,7 +96,7 @@ def get_duration(path: Path) -> float:
         print(f"[!] ERROR: Unexpected error getting duration for {path}: {e}")
         return 0.0
 
-def generate_silence(duration: float, out_path: Path) -> None:
+def generate_silence(duration: float, out_path: Path, threads: Optional[int] = None) -> None:
     """Generate a silence audio file using FFmpeg.
     
     This function creates a silence audio file that can be used for
@@ -100,6 +106,7 @@ def generate_silence(duration: float, out_path: Path) -> None:
     Args:
         duration: Duration of silence in seconds.
         out_path: Output path for the silence file.
+        threads: FFmpeg thread count (default: FFmpeg decides).
         
     Raises:
         RuntimeError: If FFmpeg fails to generate silence.
@@ -133,6 +140,7 @@ def generate_silence(duration: float, out_path: Path) -> None:
             '-i', f'anullsrc=r={SAMPLE_RATE}:cl=mono',
             '-t', str(duration),
             '-c:a', 'pcm_s16le',  # 16-bit PCM WAV
+            *_thread_args(threads),
             str(out_path)
         ]
         
@@ -158,7 +166,8 @@ def generate_silence(duration: float, out_path: Path) -> None:
     except Exception as e:
         raise RuntimeError(f"Unexpected error generating silence: {e}")
 
-def fit_audio(audio_path: Path, target_dur: float, max_speedup: float = 1.8) -> Path:
+def fit_audio(audio_path: Path, target_dur: float, max_speedup: float = 1.8,
+              threads: Optional[int] = None) -> Path:
     """Fit audio duration to target duration using time-stretching.
     
     This function adjusts the duration of an audio file to match a target
@@ -171,6 +180,7 @@ def fit_audio(audio_path: Path, target_dur: float, max_speedup: float = 1.8) ->
         target_dur: Target duration in seconds.
         max_speedup: Maximum speedup ratio allowed (default: 1.8).
                     Higher values may cause significant audio quality degradation.
+        threads: FFmpeg thread count (default: FFmpeg decides).
                     
     Returns:
         Path to the processed audio file. If no processing is needed,
@@ -238,6 +248,7 @@ def fit_audio(audio_path: Path, target_dur: float, max_speedup: float = 1.8) ->
             '-filter:a', filter_complex,
             '-t', str(target_dur),  # Strictly enforce target duration
             '-c:a', 'pcm_s16le',  # Output as WAV
+            *_thread_args(threads),
             str(out_path)
         ]
         
@@ -268,6 +279,77 @@ def fit_audio(audio_path: Path, target_dur: float, max_speedup: float = 1.8) ->
     except Exception as e:
         raise RuntimeError(f"Unexpected error fitting audio: {e}")
 
+def _pipe_ffmpeg(cmd: List[str], data: bytes, timeout: int = 120) -> bytes:
+    """Run an FFmpeg command reading pipe:0 and writing pipe:1."""
+    result = subprocess.run(cmd, input=data, capture_output=True, check=True, timeout=timeout)
+    return result.stdout
+
+def fit_audio_pcm(audio: bytes, target_dur: float, max_speedup: float = 1.8,
+                  threads: Optional[int] = None) -> bytes:
+    """In-memory variant of fit_audio() for TTS output.
+    
+    Decodes the encoded audio (e.g. Edge TTS MP3 bytes) to raw PCM through
+    FFmpeg pipes and time-stretches it with atempo if it is longer than the
+    slot. Nothing touches the disk.
+    
+    Args:
+        audio: Encoded audio bytes.
+        target_dur: Target duration in seconds.
+        max_speedup: Maximum speedup ratio allowed (default: 1.8).
+        threads: FFmpeg thread count per pass (default: FFmpeg decides).
+        
+    Returns:
+        Signed 16-bit little-endian mono PCM at SAMPLE_RATE. Audio that
+        could not be sped up enough may still be longer than target_dur;
+        mix_audio_track() trims it to the slot.
+        
+    Raises:
+        ValueError: If target duration is invalid.
+        RuntimeError: If the audio cannot be decoded.
+    """
+    if target_dur <= 0:
+        raise ValueError(f"Target duration must be positive, got {target_dur}")
+    
+    pcm_format = ['-f', 's16le', '-ar', str(SAMPLE_RATE), '-ac', '1']
+    
+    try:
+        pcm = _pipe_ffmpeg(
+            ['ffmpeg', '-v', 'error', '-i', 'pipe:0', *pcm_format,
+             *_thread_args(threads), 'pipe:1'],
+            audio,
+        )
+    except subprocess.TimeoutExpired:
+        raise RuntimeError("FFmpeg timeout decoding audio")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"FFmpeg failed to decode audio: {e.stderr.decode(errors='replace')[-200:]}")
+    
+    actual_dur = len(pcm) / (2 * SAMPLE_RATE)
+    if actual_dur == 0.0:
+        raise RuntimeError("Decoded audio is empty")
+    
+    # Tolerance for floating point errors (100ms)
+    if actual_dur <= target_dur + 0.1:
+        return pcm
+    
+    ratio = actual_dur / target_dur
+    if ratio > max_speedup:
+        print(f"[!] WARNING: Speedup ratio {ratio:.2f}x exceeds max {max_speedup}x")
+        ratio = max_speedup
+    
+    try:
+        return _pipe_ffmpeg(
+            ['ffmpeg', '-v', 'error', *pcm_format, '-i', 'pipe:0',
+             '-filter:a', f"atempo={ratio:.4f}", '-t', str(target_dur),
+             *pcm_format, *_thread_args(threads), 'pipe:1'],
+            pcm,
+        )
+    except subprocess.TimeoutExpired:
+        raise RuntimeError("FFmpeg timeout fitting audio")
+    except subprocess.CalledProcessError as e:
+        print(f"[!] ERROR: Audio fitting failed: {e}")
+        print("    Returning original audio (may cause timing issues)")
+        return pcm  # Fallback to original
+
 def create_concat_file(segments: List[Dict], silence_ref: Path, output_txt: Path) -> None:
     """Create FFmpeg concatenation manifest for audio segments.
     
@@ -363,7 +445,65 @@ def create_concat_file(segments: List[Dict], silence_ref: Path, output_txt: Path
     except Exception as e:
         raise RuntimeError(f"Failed to create concat manifest: {e}")
 
-def render_video(video_path: Path, concat_file: Path, output_path: Path, subtitle_path: Optional[Path] = None) -> None:
+def mix_audio_track(segments: List[Dict]) -> bytearray:
+    """Assemble the full dubbed audio track in memory.
+    
+    Each segment's PCM (from fit_audio_pcm) is copied into a silent buffer
+    covering the whole timeline at its start offset, trimmed to its slot.
+    The result is fed straight to render_video(), replacing the silence
+    file + concat manifest approach.
+    
+    Args:
+        segments: List of audio segments with timing information.
+                 Each segment should have 'start', 'end' and optionally
+                 'processed_audio' (PCM bytes) keys. Segments without
+                 audio stay silent. 'processed_audio' is removed from
+                 each segment once copied, so the PCM is only held once.
+        
+    Returns:
+        Signed 16-bit little-endian mono PCM at SAMPLE_RATE.
+        
+    Raises:
+        ValueError: If segment format is invalid.
+        
+    Example:
+        >>> track = mix_audio_track(chunks)
+        >>> render_video(video, track, output)
+    """
+    if not segments:
+        raise ValueError("No segments provided for mixing")
+    
+    # Validate segment format
+    required_keys = {'start', 'end'}
+    for i, seg in enumerate(segments):
+        if not required_keys.issubset(seg.keys()):
+            raise ValueError(f"Segment {i} missing required keys: {required_keys - seg.keys()}")
+        if seg['start'] >= seg['end']:
+            raise ValueError(f"Segment {i} has invalid timing: start >= end")
+    
+    bytes_per_sec = 2 * SAMPLE_RATE  # 16-bit mono
+    total_duration = segments[-1]['end']
+    track = bytearray(int(total_duration * SAMPLE_RATE) * 2)
+    audio_count = 0
+    
+    for i, segment in enumerate(segments):
+        pcm = segment.pop('processed_audio', None)
+        if not pcm:
+            print(f"[!] WARNING: Missing audio for segment {i}, using silence")
+            continue
+        
+        # Sample-aligned offset and slot length in bytes
+        offset = int(segment['start'] * SAMPLE_RATE) * 2
+        slot = int((segment['end'] - segment['start']) * SAMPLE_RATE) * 2
+        piece = memoryview(pcm)[:min(slot, len(track) - offset)]
+        track[offset:offset + len(piece)] = piece
+        audio_count += 1
+    
+    print(f"[+] Audio track assembled: {len(track) / bytes_per_sec:.2f}s, {audio_count} segments")
+    return track
+
+def render_video(video_path: Path, audio_track: Union[Path, bytes, bytearray], output_path: Path, subtitle_path: Optional[Path] = None,
+                 threads: Optional[int] = None) -> None:
     """Render the final dubbed video using FFmpeg with optional hard subtitles.
     
     This function renders the final video by combining the original video
@@ -373,9 +513,12 @@ def render_video(video_path: Path, concat_file: Path, output_path: Path, subtitl
     
     Args:
         video_path: Path to the original video file.
-        concat_file: Path to the audio concatenation manifest file.
+        audio_track: Raw PCM bytes from mix_audio_track() (piped to FFmpeg),
+                    or a path to an audio file / concat manifest (.txt)
+                    from create_concat_file().
         output_path: Path where the final video will be saved.
         subtitle_path: Optional path to SRT subtitle file for hardsubs.
+        threads: FFmpeg thread count (default: FFmpeg decides).
         
     Raises:
         FileNotFoundError: If input files don't exist.
@@ -391,8 +534,9 @@ def render_video(video_path: Path, concat_file: Path, output_path: Path, subtitl
     # Validate input files
     if not video_path.exists():
         raise FileNotFoundError(f"Video file not found: {video_path}")
-    if not concat_file.exists():
-        raise FileNotFoundError(f"Concat file not found: {concat_file}")
+    piped_audio = isinstance(audio_track, (bytes, bytearray))
+    if not piped_audio and not audio_track.exists():
+        raise FileNotFoundError(f"Audio track not found: {audio_track}")
     
     # Ensure output directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -400,7 +544,7 @@ def render_video(video_path: Path, concat_file: Path, output_path: Path, subtitl
     try:
         print(f"[*] Rendering final video:")
         print(f"    Source video: {video_path}")
-        print(f"    Audio concat: {concat_file}")
+        print(f"    Audio track: {'<in-memory PCM>' if piped_audio else audio_track}")
         if subtitle_path:
             print(f"    Subtitles: {subtitle_path} (Re-encoding required)")
         print(f"    Output: {output_path}")
@@ -409,11 +553,16 @@ def render_video(video_path: Path, concat_file: Path, output_path: Path, subtitl
         cmd = [
             'ffmpeg', '-y', '-v', 'error',
             '-i', str(video_path),        # Input 0: Video
-            '-f', 'concat', '-safe', '0', 
-            '-i', str(concat_file),       # Input 1: Audio concat
+        ]
+        if piped_audio:
+            cmd.extend(['-f', 's16le', '-ar', str(SAMPLE_RATE), '-ac', '1'])
+        elif audio_track.suffix == '.txt':
+            cmd.extend(['-f', 'concat', '-safe', '0'])
+        cmd.extend([
+            '-i', 'pipe:0' if piped_audio else str(audio_track),  # Input 1: Audio
             '-map', '0:v',                # Use video from input 0
             '-map', '1:a',                # Use audio from input 1
-        ]
+        ])
         
         if subtitle_path:
             # --- HARD SUB MODE (Re-encode required) ---
@@ -442,33 +591,25 @@ def render_video(video_path: Path, concat_file: Path, output_path: Path, subtitl
             '-ar', str(SAMPLE_RATE),
             '-ac', str(AUDIO_CHANNELS),
             '-shortest',
+            *_thread_args(threads),
             str(output_path)
         ])
         
-        # Run FFmpeg with progress monitoring
+        # Run FFmpeg, feeding the in-memory track through stdin if given
         process = subprocess.Popen(
             cmd,
-            stdout=subprocess.PIPE,
+            stdin=subprocess.PIPE if piped_audio else subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
             stderr=subprocess.PIPE,
-            text=True,
-            universal_newlines=True
         )
         
-        # Monitor progress (simple implementation)
         print("    Processing...")
-        while True:
-            output = process.stderr.readline()
-            if output == '' and process.poll() is not None:
-                break
-            if output:
-                # Could parse FFmpeg progress here if needed
-                pass
+        _, error_output = process.communicate(input=audio_track if piped_audio else None)
         
         # Check result
-        return_code = process.poll()
+        return_code = process.returncode
         if return_code != 0:
-            error_output = process.stderr.read()
-            raise RuntimeError(f"FFmpeg failed with code {return_code}: {error_output}")
+            raise RuntimeError(f"FFmpeg failed with code {return_code}: {error_output.decode(errors='replace')}")
         
         # Verify output file
         if not output_path.exists():